@@ -16,47 +16,94 @@ Outputs:
 
 import csv
 import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
 from urllib.parse import urlparse
 
 import pandas as pd
-from bs4 import BeautifulSoup, Tag
+from lxml import etree, html
 from tqdm import tqdm
 
 
 # ── HTML parsing helpers (reused from extract_dfars_sections.py) ────
 
 
-def _get_amendment_instruction(section_div: Tag) -> str:
+def _has_class(name: str) -> str:
+    """XPath predicate matching elements whose class list contains `name`."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Whitespace-only text carries nothing the extractor reads, so don't build
+# tree nodes for it. Comments are kept: removing them makes libxml2 merge the
+# text on either side, which changes the extracted text.
+_HTML_PARSER = html.HTMLParser(encoding="utf-8", remove_blank_text=True)
+
+_SECTIONS = etree.XPath(f"//div[{_has_class('section')}]")
+_SECTIONS_AND_AMENDMENT_PARTS = etree.XPath(
+    f"//div[{_has_class('section')}] | //p[{_has_class('amendment-part')}]"
+)
+_AMENDMENT_PARTS = etree.XPath(f"//p[{_has_class('amendment-part')}]")
+_SECTNO_REFERENCE = etree.XPath(
+    f"(.//div[{_has_class('sectno-reference')}])[1]/@id"
+)
+_SECTION_SUBJECT = etree.XPath(f"(.//div[{_has_class('section-subject')}])[1]")
+_HAS_SUBNUMBER = etree.XPath(
+    f"boolean(.//span[{_has_class('amendment-part-subnumber')}])"
+)
+
+# Section numbers mentioned in amendment text, e.g. "section 216.102"
+_FALLBACK_SECTION_RE = re.compile(r"[Ss]ection\s+(\d{3}\.\d[\w\-\.]*)")
+
+
+def _get_text(elem: html.HtmlElement) -> str:
+    """Join the stripped, non-empty text fragments under `elem` with spaces."""
+    return " ".join([t for s in elem.itertext() if (t := s.strip())])
+
+
+def _get_section_num(section_div: html.HtmlElement) -> str:
+    """Return the DFARS section number from a div.section's sectno-reference id."""
+    sec_ids = _SECTNO_REFERENCE(section_div)
+    if not sec_ids:
+        return ""
+    return sec_ids[0].replace("sectno-reference-", "").strip()
+
+
+def _get_amendment_instruction(section_div: html.HtmlElement) -> str:
     """
     Walk backwards from a div.section to find the amendment-part <p>
     that introduced it (e.g. "2. Revise section 216.102 to read as follows:").
     """
-    for prev in section_div.previous_siblings:
-        if isinstance(prev, Tag) and "amendment-part" in prev.get("class", []):
-            text = prev.get_text(separator=" ", strip=True)
+    prev = section_div.getprevious()
+    while prev is not None:
+        # Comments and PIs have a non-string tag; only elements carry a class
+        if (
+            isinstance(prev.tag, str)
+            and "amendment-part" in (prev.get("class") or "").split()
+        ):
+            text = _get_text(prev)
             if text:
                 return text
+        prev = prev.getprevious()
     return ""
 
 
-def _get_section_content(section_div: Tag) -> str:
+def _get_section_content(section_div: html.HtmlElement) -> str:
     """
     Extract the textual content of a div.section, excluding the section
     number header itself.
     """
-    parts = []
-    for child in section_div.children:
-        if isinstance(child, Tag):
-            # Skip the section-number div
-            if "sectno" in child.get("class", []):
-                continue
-            parts.append(child.get_text(separator=" ", strip=True))
+    parts = (
+        _get_text(child)
+        for child in section_div.iterchildren(tag=etree.Element)
+        # Skip the section-number div
+        if "sectno" not in (child.get("class") or "").split()
+    )
     return "\n".join(p for p in parts if p)
 
 
 def _collect_amended_section_instructions(
-    soup: BeautifulSoup,
+    root: html.HtmlElement,
 ) -> dict[str, dict[str, str]]:
     """
     For sections that are '[Amended]' (no new content provided), collect
@@ -64,30 +111,32 @@ def _collect_amended_section_instructions(
 
     Returns a dict mapping section_num -> {"instruction": ..., "content": ...}
     """
+    # One document-order pass: record every amendment-part <p> and, for
+    # each div.section, where in that list the paragraphs following it start.
+    amendment_parts: list[html.HtmlElement] = []
+    section_divs: list[tuple[html.HtmlElement, int]] = []
+    for elem in _SECTIONS_AND_AMENDMENT_PARTS(root):
+        if elem.tag == "div":
+            section_divs.append((elem, len(amendment_parts)))
+        else:
+            amendment_parts.append(elem)
+
     result: dict[str, dict[str, str]] = {}
-    for section_div in soup.find_all("div", class_="section"):
-        subject = section_div.find("div", class_="section-subject")
-        if not subject or "[Amended]" not in subject.get_text():
-            continue
-        sectno_div = section_div.find("div", class_="sectno-reference")
-        if not sectno_div:
+    for section_div, start in section_divs:
+        subjects = _SECTION_SUBJECT(section_div)
+        if not subjects or "[Amended]" not in "".join(subjects[0].itertext()):
             continue
-        sec_id = sectno_div.get("id", "")
-        section_num = sec_id.replace("sectno-reference-", "").strip()
+        section_num = _get_section_num(section_div)
         if not section_num:
             continue
 
         main_instruction = ""
         sub_instructions = []
-        for elem in section_div.find_all_next("p", class_="amendment-part"):
-            if not isinstance(elem, Tag):
-                continue
-            if elem.find("span", class_="amendment-part-subnumber"):
-                sub_instructions.append(
-                    elem.get_text(separator=" ", strip=True)
-                )
+        for elem in islice(amendment_parts, start, None):
+            if _HAS_SUBNUMBER(elem):
+                sub_instructions.append(_get_text(elem))
             elif not main_instruction:
-                main_instruction = elem.get_text(separator=" ", strip=True)
+                main_instruction = _get_text(elem)
             else:
                 break
 
@@ -115,21 +164,16 @@ def extract_dfars_sections(html_path: Path) -> list[dict]:
       - amendment_instruction   (e.g. "2. Revise section 216.102 ...")
       - content                 (the new section text, or sub-instructions)
     """
-    with open(html_path, "r", encoding="utf-8") as f:
-        soup = BeautifulSoup(f.read(), "html.parser")
+    root = html.parse(str(html_path), parser=_HTML_PARSER).getroot()
 
     # Pre-collect [Amended] sub-instructions
-    amended_instructions = _collect_amended_section_instructions(soup)
+    amended_instructions = _collect_amended_section_instructions(root)
 
     results: list[dict] = []
     seen_sections: set[str] = set()
 
-    for section_div in soup.find_all("div", class_="section"):
-        sectno_div = section_div.find("div", class_="sectno-reference")
-        if not sectno_div:
-            continue
-        sec_id = sectno_div.get("id", "")
-        section_num = sec_id.replace("sectno-reference-", "").strip()
+    for section_div in _SECTIONS(root):
+        section_num = _get_section_num(section_div)
         if not section_num or section_num in seen_sections:
             continue
         if not _is_in_200_range(section_num):
@@ -155,11 +199,9 @@ def extract_dfars_sections(html_path: Path) -> list[dict]:
 
     # Fallback: if no div.section found, try regex on amendment-part text
     if not results:
-        for p_tag in soup.find_all("p", class_="amendment-part"):
-            text = p_tag.get_text(separator=" ", strip=True)
-            matches = re.findall(
-                r"[Ss]ection\s+(\d{3}\.\d[\w\-\.]*)", text
-            )
+        for p_tag in _AMENDMENT_PARTS(root):
+            text = _get_text(p_tag)
+            matches = _FALLBACK_SECTION_RE.findall(text)
             for m in matches:
                 if m not in seen_sections and _is_in_200_range(m):
                     seen_sections.add(m)
@@ -189,6 +231,16 @@ def _extract_doc_id_from_url(url: str) -> str | None:
 
 # ── Main ───────────────────────────────────────────────────────────
 
+DETAIL_COLUMNS = (
+    "ndaa_year",
+    "ndaa_section",
+    "case_number",
+    "document_id",
+    "affected_dfars_section",
+    "amendment_instruction",
+    "content",
+)
+
 
 def main():
     csv_path = Path("./data/ndaa_final_rule_with_rationale.csv")
@@ -200,98 +252,101 @@ def main():
     df = pd.read_csv(csv_path, dtype=str).fillna("")
     print(f"Found {len(df)} rows in {csv_path}\n")
 
-    all_details: list[dict] = []
+    # Resolve each row's URLs (newline-separated) to document IDs once
+    row_doc_ids: list[list[str]] = (
+        df["fr_body_html_url"]
+        .str.split("\n")
+        .map(lambda urls: [d for d in map(_extract_doc_id_from_url, urls) if d])
+        .tolist()
+    )
+
+    # Collect each unique document once; several rows can share a rule
+    unique_docs: dict[str, Path] = {}
+    for doc_id in dict.fromkeys(chain.from_iterable(row_doc_ids)):
+        html_file = html_dir / f"{doc_id}.html"
+        if html_file.exists():
+            unique_docs[doc_id] = html_file
+
+    # Parsing is CPU-bound and independent per file, so fan it out
+    with ProcessPoolExecutor() as ex:
+        parsed_docs = dict(zip(
+            unique_docs,
+            tqdm(
+                ex.map(extract_dfars_sections, unique_docs.values(), chunksize=8),
+                total=len(unique_docs),
+                desc="Extracting DFARS sections",
+            ),
+        ))
+
     affected_sections_col: list[str] = []
     skipped: list[str] = []
     processed_count = 0
+    detail_count = 0
+
+    # Stream detail rows to disk as each CSV row is joined
+    with open(detail_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(DETAIL_COLUMNS)
+
+        rows = zip(
+            df.index,
+            row_doc_ids,
+            df["ndaa_year"].to_numpy(),
+            df["ndaa_section"].to_numpy(),
+            df["case_number"].to_numpy(),
+        )
+        for idx, doc_ids, ndaa_year, ndaa_section, case_number in rows:
+            row_sections: list[str] = []
+            row_has_data = False
+
+            for doc_id in doc_ids:
+                if doc_id not in parsed_docs:
+                    skipped.append(f"{doc_id} (row {idx})")
+                    continue
+
+                sections = parsed_docs[doc_id]
+
+                if not sections:
+                    skipped.append(f"{doc_id} (row {idx}, no sections)")
+                    continue
+
+                row_has_data = True
+                for s in sections:
+                    section_num = s["affected_dfars_section"]
+                    if section_num not in row_sections:
+                        row_sections.append(section_num)
+                writer.writerows(
+                    (
+                        ndaa_year,
+                        ndaa_section,
+                        case_number,
+                        doc_id,
+                        s["affected_dfars_section"],
+                        s["amendment_instruction"],
+                        s["content"],
+                    )
+                    for s in sections
+                )
+                detail_count += len(sections)
+
+            if row_has_data:
+                processed_count += 1
 
-    for idx, row in tqdm(df.iterrows(), total=len(df), desc="Extracting DFARS sections"):
-        url_field = row.get("fr_body_html_url", "")
-        ndaa_year = row.get("ndaa_year", "")
-        ndaa_section = row.get("ndaa_section", "")
-        case_number = row.get("case_number", "")
-
-        # Handle multi-URL rows (newline-separated)
-        urls = [u.strip() for u in url_field.split("\n") if u.strip()]
-
-        row_sections: list[str] = []
-        row_has_data = False
-
-        for url in urls:
-            doc_id = _extract_doc_id_from_url(url)
-            if not doc_id:
-                continue
-
-            html_file = html_dir / f"{doc_id}.html"
-            if not html_file.exists():
-                skipped.append(f"{doc_id} (row {idx})")
-                continue
-
-            sections = extract_dfars_sections(html_file)
-
-            if not sections:
-                skipped.append(f"{doc_id} (row {idx}, no sections)")
-                continue
-
-            row_has_data = True
-            for s in sections:
-                section_num = s["affected_dfars_section"]
-                if section_num not in row_sections:
-                    row_sections.append(section_num)
-                all_details.append({
-                    "ndaa_year": ndaa_year,
-                    "ndaa_section": ndaa_section,
-                    "case_number": case_number,
-                    "document_id": doc_id,
-                    "affected_dfars_section": section_num,
-                    "amendment_instruction": s["amendment_instruction"],
-                    "content": s["content"],
-                })
-
-        if row_has_data:
-            processed_count += 1
-
-        affected_sections_col.append(";".join(row_sections))
+            affected_sections_col.append(";".join(row_sections))
 
     # Add the new column to the dataframe
     df["affected_dfars_sections"] = affected_sections_col
 
-    # Filter: only rows with a valid URL and at least one affected DFARS section
+    # Filter: only rows with a valid URL and at least one affected DFARS section.
+    # Every detail row written above comes from such a row, so the detail CSV
+    # needs no matching filter.
     df_filtered = df[
         df["fr_body_html_url"].str.strip().astype(bool)
         & df["affected_dfars_sections"].str.strip().astype(bool)
     ].copy()
     df_filtered.to_csv(output_path, index=False)
     print(f"\n✅ Wrote {len(df_filtered)} rows to {output_path} (filtered from {len(df)})")
-
-    # Also filter the details to only include rows for documents in the filtered set
-    filtered_doc_ids = set()
-    for _, r in df_filtered.iterrows():
-        urls = [u.strip() for u in str(r.get("fr_body_html_url", "")).split("\n") if u.strip()]
-        for u in urls:
-            did = _extract_doc_id_from_url(u)
-            if did:
-                filtered_doc_ids.add(did)
-    all_details = [d for d in all_details if d["document_id"] in filtered_doc_ids]
-
-    # Write detail CSV
-    with open(detail_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=[
-                "ndaa_year",
-                "ndaa_section",
-                "case_number",
-                "document_id",
-                "affected_dfars_section",
-                "amendment_instruction",
-                "content",
-            ],
-        )
-        writer.writeheader()
-        writer.writerows(all_details)
-
-    print(f"✅ Wrote {len(all_details)} rows to {detail_path}")
+    print(f"✅ Wrote {detail_count} rows to {detail_path}")
     print(f"\n   Processed: {processed_count} / {len(df)} rows with data")
     if skipped:
         print(f"   Skipped {len(skipped)} document IDs:")
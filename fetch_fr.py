@@ -1,14 +1,28 @@
 import argparse
+import asyncio
+import hashlib
+import json
+import os
 import re
-import requests
-import pandas as pd
 import time
+import aiohttp
+import pandas as pd
 from datetime import datetime
 from tqdm import tqdm
+from tqdm.asyncio import tqdm_asyncio
 
 INPUT_CSV = "./data/tracker.csv"
 OUTPUT_CSV = "./data/fr_cases.csv"
 
+FR_API_URL = "https://www.federalregister.gov/api/v1/documents.json"
+# Concurrent publication-date queries against the FR API
+MAX_CONCURRENT_REQUESTS = 5
+# On-disk cache of API responses, keyed on URL + query params
+CACHE_DIR = "./data/fr_api_cache"
+CACHE_MAX_AGE = 86400  # seconds
+
+_DFARS_CASE_RE = re.compile(r'DFARS Case ([A-Za-z0-9-]+)', re.IGNORECASE)
+
 def parse_fr_date(date_str):
     """Parse a date string in MM/DD/YY or MM/DD/YYYY format to YYYY-MM-DD."""
     date_str = date_str.strip()
@@ -20,7 +34,7 @@ def parse_fr_date(date_str):
     return None
 
 
-def fetch_citation_by_date_and_page(citation=None, fr_date=None):
+def _base_params():
     fields = [
         "document_number",
         "citation",
@@ -31,7 +45,7 @@ def fetch_citation_by_date_and_page(citation=None, fr_date=None):
         "cfr_references",
     ]
 
-    params = {
+    return {
         "conditions[agencies][]": ["defense-acquisition-regulations-system", "defense-department"],
         "conditions[type][]": "RULE",
         "conditions[cfr][title]": "48",
@@ -41,52 +55,127 @@ def fetch_citation_by_date_and_page(citation=None, fr_date=None):
         "per_page": "1000",
     }
 
-    # Initialize variables to avoid UnboundLocalError
-    page = None
-    iso_date = None
 
-    # Parse citation into volume and page
-    if citation is not None:
+def _to_query(params):
+    """Flatten list-valued params into repeated (key, value) pairs."""
+    query = []
+    for key, value in params.items():
+        if isinstance(value, list):
+            query.extend((key, v) for v in value)
+        else:
+            query.append((key, value))
+    return query
+
+
+def _cache_path(query):
+    key = json.dumps([FR_API_URL, query])
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, f"{digest}.json")
+
+
+def _read_cache(path):
+    """Return the cached response at path, or None if missing or stale."""
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_MAX_AGE:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(path, data):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+async def _fetch_documents(session, semaphore, params, label):
+    """Run one documents.json query; returns its results, or None on error."""
+    query = _to_query(params)
+    cache_path = _cache_path(query)
+    data = _read_cache(cache_path)
+    if data is not None:
+        return data.get("results", [])
+
+    async with semaphore:
+        try:
+            async with session.get(FR_API_URL, params=query) as response:
+                response.raise_for_status()
+                data = await response.json()
+            _write_cache(cache_path, data)
+            return data.get("results", [])
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            tqdm.write(f"  API error for {label}: {e}")
+            return None
+
+
+async def _fetch_ndaa_documents():
+    params = _base_params()
+    params["conditions[term]"] = "NDAA"
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+        return await _fetch_documents(session, asyncio.Semaphore(1), params, "NDAA search")
+
+
+async def _fetch_documents_by_date(iso_dates):
+    """Query every publication date concurrently; returns {iso_date: results}."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+        tasks = []
+        for iso_date in iso_dates:
+            params = _base_params()
+            params["conditions[publication_date][gte]"] = iso_date
+            params["conditions[publication_date][lte]"] = iso_date
+            tasks.append(_fetch_documents(session, semaphore, params, iso_date))
+        results = await tqdm_asyncio.gather(*tasks, desc="Fetching FR documents by date")
+    return dict(zip(iso_dates, results))
+
+
+def fetch_ndaa_documents():
+    """Full-text search for DFARS final rules that mention the NDAA."""
+    return asyncio.run(_fetch_ndaa_documents()) or []
+
+
+def fetch_citations_by_date_and_page(citations):
+    """
+    Resolve (citation, fr_date) pairs such as ("89 FR 53474", "06/27/24")
+    to FR documents. Citations are grouped by publication date so each date
+    is queried once, then matched on start page. Returns the matched
+    documents in input order.
+    """
+    # Parse citation into page and date
+    parsed = []  # (citation, iso_date, page)
+    for citation, fr_date in citations:
         parts = citation.strip().split(" FR ")
         if len(parts) != 2:
             tqdm.write(f"  Could not parse citation format: {citation}")
-        else:
-            page = parts[1].strip()
-
-    # Parse date
-    if fr_date is not None:
+            continue
         iso_date = parse_fr_date(fr_date)
         if not iso_date:
             tqdm.write(f"  Could not parse date: {fr_date}")
-    
-    if page is not None and iso_date is not None:
-        params["conditions[publication_date][gte]"] = iso_date
-        params["conditions[publication_date][lte]"] = iso_date
-    else:
-        params["conditions[term]"] = "NDAA"
-
-    try:
-        response = requests.get(
-            "https://www.federalregister.gov/api/v1/documents.json",
-            params=params,
-            timeout=30,
-        )
-        response.raise_for_status()
-        data = response.json()
+            continue
+        parsed.append((citation, iso_date, parts[1].strip()))
 
-        if page is not None:
-            for result in data.get("results", []):
-                if str(result.get("start_page")) == page:
-                    return result
-        else:
-            return data.get("results", [])
+    iso_dates = list(dict.fromkeys(iso_date for _, iso_date, _ in parsed))
+    results_by_date = asyncio.run(_fetch_documents_by_date(iso_dates))
 
-        tqdm.write(f"  No page match for {citation} on {iso_date}")
-        return None
+    # {iso_date: {start_page: doc}}, keeping the first document per page
+    docs_by_page = {}
+    for iso_date, results in results_by_date.items():
+        pages = docs_by_page[iso_date] = {}
+        for result in results or []:
+            pages.setdefault(str(result.get("start_page")), result)
 
-    except requests.exceptions.RequestException as e:
-        tqdm.write(f"  API error for {citation}: {e}")
-        return None
+    docs = []
+    for citation, iso_date, page in parsed:
+        if results_by_date[iso_date] is None:
+            continue
+        doc = docs_by_page[iso_date].get(page)
+        if doc:
+            docs.append(doc)
+        else:
+            tqdm.write(f"  No page match for {citation} on {iso_date}")
+    return docs
 
 
 def main():
@@ -94,7 +183,7 @@ def main():
 
     # First: manual seach for FR cases with NDAA in the content
     # API is provided by FR
-    docs = fetch_citation_by_date_and_page()
+    docs = fetch_ndaa_documents()
     for doc in tqdm(docs, desc="Processing fetched FR documents - manual search"):
         case = doc["document_number"]
         if case not in fr_cases:
@@ -102,25 +191,26 @@ def main():
 
     # Second: search for FR cases based on tracker
     # Unique cases identified by citation and publication date
-    tracker = pd.read_csv(INPUT_CSV)
-    for idx, row in tqdm(tracker.iterrows(), total=len(tracker), desc="Fetching FR documents based on tracker"):
-        if pd.isna(row.get("citation")) or pd.isna(row.get("publication_date")):
-            continue
-
-        citations = str(row["citation"]).split(";")
-        dates = str(row["publication_date"]).split(";")
+    # Multi-rule rows hold ";"-separated citations with matching dates
+    tracker = pd.read_csv(INPUT_CSV).dropna(subset=["citation", "publication_date"])
+    citations = [
+        pair
+        for row_citations, dates in zip(
+            tracker["citation"].astype(str).str.split(";"),
+            tracker["publication_date"].astype(str).str.split(";"),
+        )
+        for pair in zip(row_citations, dates)
+    ]
 
-        for citation, date in zip(citations, dates):
-            doc = fetch_citation_by_date_and_page(citation, date)
-            if doc:
-                case = doc["document_number"]
-                if case not in fr_cases:
-                    fr_cases[case] = doc
+    for doc in fetch_citations_by_date_and_page(citations):
+        case = doc["document_number"]
+        if case not in fr_cases:
+            fr_cases[case] = doc
 
     if fr_cases:
         for case, doc in list(fr_cases.items()):
             title = doc.get("title", "")
-            match = re.search(r'DFARS Case ([A-Za-z0-9-]+)', title, re.IGNORECASE)
+            match = _DFARS_CASE_RE.search(title)
             if match:
                 doc["dfars_case"] = match.group(1).strip()
                 doc["cfr_references"] = [cit["part"] for cit in doc["cfr_references"]]
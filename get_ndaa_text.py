@@ -7,8 +7,9 @@ from pathlib import Path
 import ndaa.utils as ndaa_utils
 
 DOC_TO_NDAA_CSV = Path("./data/doc_to_ndaa.csv")
+CITATION_KEY = ["ndaa_year", "title", "subtitle", "section", "subsection"]
 
-def get_text(citation):
+def get_text(citation, index=None):
     year = citation["ndaa_year"]
     title = citation["title"]
     subtitle = citation["subtitle"]
@@ -19,12 +20,12 @@ def get_text(citation):
 
     try:
         if title != "":
-            text = ndaa_utils.get_title_text(year, title)
+            text = ndaa_utils.get_title_text(year, title, index=index)
         elif section != "":
-            text = ndaa_utils.get_section_text(year, section)
+            text = ndaa_utils.get_section_text(year, section, index=index)
             if subsection != "":
                 subsection = subsection[:3]
-                text = ndaa_utils.get_subsection_text(year, section, subsection)
+                text = ndaa_utils.get_subsection_text(year, section, subsection, index=index)
     except ValueError:
         tqdm.write(f"Could not find text for citation: {citation}")
     except FileNotFoundError:
@@ -33,19 +34,34 @@ def get_text(citation):
 
 def main():
     doc_to_ndaa_df = pd.read_csv(DOC_TO_NDAA_CSV)
-    
-    ndaa_text = []
 
-    for _, row in tqdm(doc_to_ndaa_df.iterrows(), total=len(doc_to_ndaa_df)):
-        citations = ast.literal_eval(row["citations"])
-        for citation in citations:
-            text = get_text(citation)
+    # One row per citation, in document order
+    citations = pd.DataFrame(
+        doc_to_ndaa_df["citations"].map(ast.literal_eval).explode().dropna().tolist(),
+        columns=CITATION_KEY,
+    )
+
+    # Resolve each distinct citation once, grouped by year so each NDAA JSON
+    # is loaded and indexed once and released before the next one
+    unique_citations = citations.drop_duplicates()
+    resolved = []
+    for year, group in tqdm(unique_citations.groupby("ndaa_year", sort=False)):
+        try:
+            index = ndaa_utils.build_node_index(ndaa_utils.load_ndaa(year))
+        except FileNotFoundError:
+            tqdm.write(f"NDAA file does not exist for year: {year}")
+            continue
+        for citation in group.to_dict("records"):
+            text = get_text(citation, index)
             if text is not None:
-                citation["text"] = text
-                ndaa_text.append(citation)
+                resolved.append({**citation, "text": text})
+        del index
 
-    ndaa_text_df = pd.DataFrame(ndaa_text)
+    # Join texts back onto every citation; an inner join keeps the left order
+    # and drops citations whose text could not be found
+    lookup_df = pd.DataFrame(resolved, columns=CITATION_KEY + ["text"])
+    ndaa_text_df = citations.merge(lookup_df, on=CITATION_KEY, how="inner")
     ndaa_text_df.to_csv("./data/ndaa_text.csv", index=False)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -8,19 +8,25 @@ Usage:
     title   = get_title_text("VIII", 2025)
 """
 
-import json
 import os
 
+import orjson
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 JSON_DIR = os.path.join(BASE_DIR, "jsons")
 
 
-def _load_ndaa(year: int) -> dict:
+def load_ndaa(year: int) -> dict:
+    """Load the parsed NDAA JSON for a fiscal year.
+
+    Pass the result as `ndaa=` to the getters below to reuse one loaded
+    NDAA across many lookups for the same year.
+    """
     path = os.path.join(JSON_DIR, f"ndaa_{year}.json")
     if not os.path.exists(path):
         raise FileNotFoundError(f"No NDAA JSON found for year {year}: {path}")
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
 
 
 def _collect_text(node: dict) -> str:
@@ -55,6 +61,32 @@ def _find_node(root: dict, node_type: str, enum_value: str) -> dict | None:
     return None
 
 
+def build_node_index(ndaa: dict) -> dict[tuple, dict]:
+    """Map (type, enum) to the first matching node, in _find_node's pre-order.
+
+    Pass the result as `index=` to the getters below to replace a full tree
+    walk per lookup with a dict hit.
+    """
+    index: dict[tuple, dict] = {}
+    stack = [ndaa]
+    while stack:
+        node = stack.pop()
+        index.setdefault((node.get("type"), node.get("enum")), node)
+        stack.extend(reversed(node.get("children", [])))
+    return index
+
+
+def _find_top_node(
+    year: int, node_type: str, enum_value: str, ndaa: dict | None, index: dict | None
+) -> dict | None:
+    """Look up a node in `index` if given, else walk `ndaa` (loaded if needed)."""
+    if index is not None:
+        return index.get((node_type, enum_value))
+    if ndaa is None:
+        ndaa = load_ndaa(year)
+    return _find_node(ndaa, node_type, enum_value)
+
+
 def _find_all_sections(node: dict) -> list[dict]:
     """Recursively find all section nodes under a given node."""
     sections: list[dict] = []
@@ -78,8 +110,10 @@ def _node_to_dict(node: dict) -> dict:
 
 # ─── Public API ───────────────────────────────────────────────────────────────
 
-def get_section_text(year: int, section_number: str) -> dict:
-    node = _find_node(_load_ndaa(year), "section", section_number)
+def get_section_text(
+    year: int, section_number: str, ndaa: dict | None = None, index: dict | None = None
+) -> dict:
+    node = _find_top_node(year, "section", section_number, ndaa, index)
     if node is None:
         raise ValueError(
             f"Section {section_number} not found in NDAA {year}."
@@ -87,8 +121,14 @@ def get_section_text(year: int, section_number: str) -> dict:
     return _node_to_dict(node)
 
 
-def get_subsection_text(year: int, section_number: str, subsection_number: str) -> dict:
-    node = _find_node(_load_ndaa(year), "section", section_number)
+def get_subsection_text(
+    year: int,
+    section_number: str,
+    subsection_number: str,
+    ndaa: dict | None = None,
+    index: dict | None = None,
+) -> dict:
+    node = _find_top_node(year, "section", section_number, ndaa, index)
     if node is None:
         raise ValueError(
             f"Section {section_number} not found in NDAA {year}."
@@ -102,8 +142,10 @@ def get_subsection_text(year: int, section_number: str, subsection_number: str)
     return _node_to_dict(subsection_node)
 
 
-def get_title_text(year: int, title_number: str) -> dict:
-    node = _find_node(_load_ndaa(year), "title", title_number)
+def get_title_text(
+    year: int, title_number: str, ndaa: dict | None = None, index: dict | None = None
+) -> dict:
+    node = _find_top_node(year, "title", title_number, ndaa, index)
     if node is None:
         raise ValueError(
             f"Title {title_number} not found in NDAA {year}."
@@ -4,67 +4,91 @@ that have a FRN Citation in the Final Rule column, along with Case Numbers.
 """
 import pdfplumber
 import csv
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 PDF_PATH = "./DFARS_NDAA_Implementation_Tracker.pdf"
 OUTPUT_CSV = "./data/tracker.csv"
 
+# The tracker is a fully ruled grid, so detect cells from drawn lines only
+TABLE_SETTINGS = {
+    "vertical_strategy": "lines",
+    "horizontal_strategy": "lines",
+    "snap_tolerance": 3,
+}
 
-def extract_final_rule_citations(pdf_path):
-    results = []
 
+def _extract_page_citations(pdf_path, page_num):
+    """Extract the Final Rule citation rows from a single tracker page."""
     with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages):
-            tables = page.extract_tables()
-            if not tables:
+        page = pdf.pages[page_num]
+        tables = page.extract_tables(TABLE_SETTINGS)
+        # Drop the page's cached layout objects as soon as we're done with it
+        page.close()
+
+    results = []
+
+    for table in tables:
+        for row in table:
+            if len(row) < 17:
+                continue
+
+            ndaa_year = (row[0] or "").strip().replace("\n", " ")
+            ndaa_section = (row[1] or "").strip().replace("\n", " ")
+            para = (row[2] or "").strip()
+            section_title = (row[3] or "").strip()
+            status = (row[4] or "").strip()
+            if status != "Implemented":
+                continue
+            case_number = (row[9] or "").strip()
+            final_rule_frn = (row[14] or "").strip()
+            final_rule_date = (row[15] or "").strip()
+
+            # Normalize year: "FY 10" -> "FY10", etc.
+            ndaa_year = ndaa_year.replace("FY", "20")
+            ndaa_year = ndaa_year.replace(" ", "")
+
+            # Skip header rows (repeated on each page)
+            if ndaa_year in ("NDAA Year", "Column 1", "Column1", "") or \
+               ndaa_section in ("NDAA Section", "Column2", "") or \
+               final_rule_frn in ("FRN Citation", "Column15", "Final Rule"):
                 continue
 
-            for table in tables:
-                for row in table:
-                    if len(row) < 17:
-                        continue
-
-                    ndaa_year = (row[0] or "").strip().replace("\n", " ")
-                    ndaa_section = (row[1] or "").strip().replace("\n", " ")
-                    para = (row[2] or "").strip()
-                    section_title = (row[3] or "").strip()
-                    status = (row[4] or "").strip()
-                    if status != "Implemented":
-                        continue
-                    case_number = (row[9] or "").strip()
-                    final_rule_frn = (row[14] or "").strip()
-                    final_rule_date = (row[15] or "").strip()
-
-                    # Normalize year: "FY 10" -> "FY10", etc.
-                    ndaa_year = ndaa_year.replace("FY", "20")
-                    ndaa_year = ndaa_year.replace(" ", "")
-
-                    # Skip header rows (repeated on each page)
-                    if ndaa_year in ("NDAA Year", "Column 1", "Column1", "") or \
-                       ndaa_section in ("NDAA Section", "Column2", "") or \
-                       final_rule_frn in ("FRN Citation", "Column15", "Final Rule"):
-                        continue
-
-                    # Only include rows with a Final Rule FRN Citation
-                    if final_rule_frn:
-                        final_rule_frn = final_rule_frn.replace("\n", ";")
-                        frns = []
-                        for final_rule in final_rule_frn.split(";"):
-                            if len(final_rule.split(" ")) < 3:
-                                final_rule = final_rule[:2] + " " + final_rule[2:]
-                            frns.append(final_rule)
-                        final_rule_frn = ";".join(frns)
-
-                        results.append(
-                            {
-                                "ndaa_year": ndaa_year,
-                                "ndaa_section": ndaa_section,
-                                "section_title": section_title.replace("\n", " "),
-                                "status": status,
-                                "case_number": case_number.replace("\n", ";"),
-                                "citation": final_rule_frn,
-                                "publication_date": final_rule_date.replace("\n", ";"),
-                            }
-                        )
+            # Only include rows with a Final Rule FRN Citation
+            if final_rule_frn:
+                final_rule_frn = final_rule_frn.replace("\n", ";")
+                frns = []
+                for final_rule in final_rule_frn.split(";"):
+                    if len(final_rule.split(" ")) < 3:
+                        final_rule = final_rule[:2] + " " + final_rule[2:]
+                    frns.append(final_rule)
+                final_rule_frn = ";".join(frns)
+
+                results.append(
+                    {
+                        "ndaa_year": ndaa_year,
+                        "ndaa_section": ndaa_section,
+                        "section_title": section_title.replace("\n", " "),
+                        "status": status,
+                        "case_number": case_number.replace("\n", ";"),
+                        "citation": final_rule_frn,
+                        "publication_date": final_rule_date.replace("\n", ";"),
+                    }
+                )
+
+    return results
+
+
+def extract_final_rule_citations(pdf_path):
+    with pdfplumber.open(pdf_path) as pdf:
+        n_pages = len(pdf.pages)
+
+    # Layout analysis dominates and pages are independent, so parse them in
+    # parallel; map() keeps the results in page order.
+    results = []
+    with ProcessPoolExecutor() as ex:
+        for page_results in ex.map(_extract_page_citations, repeat(pdf_path), range(n_pages)):
+            results.extend(page_results)
 
     return results
 
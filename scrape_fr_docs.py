@@ -1,18 +1,29 @@
-import requests
+import aiohttp
+import argparse
+import asyncio
+import json
 import pandas as pd
 import os
 import re
 import csv
-import time
+from aiolimiter import AsyncLimiter
+from email.utils import formatdate
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 from tqdm import tqdm
+from tqdm.asyncio import tqdm_asyncio
 
 
 DOWNLOAD_DIR = "./data/fr_case_htmls"
 INPUT_CSV = "./data/fr_cases.csv"
 OUTPUT_CSV = "./data/case_desc.csv"
 
+# Concurrent downloads and requests per second against federalregister.gov
+MAX_CONCURRENT_DOWNLOADS = 8
+MAX_REQUESTS_PER_SECOND = 8
+# Sidecar file (inside the download dir) mapping URL -> last seen ETag
+ETAGS_FILENAME = "etags.json"
+
 # Mapping of column name -> list of heading keyword patterns to match
 SUPP_SECTIONS = {
     "background": ["background"],
@@ -26,18 +37,77 @@ SUPP_SECTIONS = {
     "paperwork_reduction": ["paperwork reduction act"],
 }
 
+# Heading numbering prefixes, e.g. "II. " or "B. "
+_ROMAN_PREFIX_RE = re.compile(r"^[ivxlc]+\.\s*")
+_LETTER_PREFIX_RE = re.compile(r"^[a-z]\.\s*")
+
+
+async def download_html(session, semaphore, limiter, url, filepath, etags, revalidate=False):
+    """Download HTML content from a URL and save to filepath.
+
+    With revalidate=True the request is conditional on the ETag recorded in
+    `etags` and the file's mtime; a 304 leaves the existing file untouched.
+    """
+    headers = {}
+    if revalidate:
+        if url in etags:
+            headers["If-None-Match"] = etags[url]
+        headers["If-Modified-Since"] = formatdate(os.path.getmtime(filepath), usegmt=True)
 
-def download_html(url, filepath):
-    """Download HTML content from a URL and save to filepath."""
+    async with semaphore, limiter:
+        try:
+            async with session.get(url.strip(), headers=headers) as response:
+                if response.status == 304:
+                    return True
+                response.raise_for_status()
+                text = await response.text()
+                etag = response.headers.get("ETag")
+            with open(filepath, "w", encoding="utf-8") as f:
+                f.write(text)
+            if etag:
+                etags[url] = etag
+            return True
+        except Exception as e:
+            if revalidate:
+                # The local copy is still usable; keep it rather than fail
+                tqdm.write(f"  Warning: could not revalidate {url}, keeping local copy: {e}")
+                return True
+            tqdm.write(f"  Error downloading {url}: {e}")
+            return False
+
+
+async def _download_all(download_list, etags):
+    """Download every (url, filepath, revalidate) entry concurrently; returns success flags."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    limiter = AsyncLimiter(MAX_REQUESTS_PER_SECOND, 1)
+    timeout = aiohttp.ClientTimeout(total=30)
+    # Keep-alive pool sized to the most requests the semaphore lets through
+    connector = aiohttp.TCPConnector(
+        limit=MAX_CONCURRENT_DOWNLOADS, limit_per_host=MAX_CONCURRENT_DOWNLOADS
+    )
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        tasks = [
+            download_html(session, semaphore, limiter, url, filepath, etags, revalidate)
+            for url, filepath, revalidate in download_list
+        ]
+        return await tqdm_asyncio.gather(*tasks, desc="Downloading HTMLs")
+
+
+def _load_etags(save_dir):
+    path = os.path.join(save_dir, ETAGS_FILENAME)
+    if not os.path.exists(path):
+        return {}
     try:
-        response = requests.get(url.strip(), timeout=30)
-        response.raise_for_status()
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(response.text)
-        return True
-    except Exception as e:
-        tqdm.write(f"  Error downloading {url}: {e}")
-        return False
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except ValueError as e:
+        tqdm.write(f"  Ignoring unreadable {path}: {e}")
+        return {}
+
+
+def _save_etags(save_dir, etags):
+    with open(os.path.join(save_dir, ETAGS_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(etags, f, indent=2, sort_keys=True)
 
 
 def url_to_filename(url):
@@ -62,8 +132,8 @@ def _classify_heading(heading_text):
     """Return the column name for a supplementary info heading, or None."""
     lower = heading_text.lower()
     # Strip leading roman numerals like "I. ", "II. "
-    lower = re.sub(r"^[ivxlc]+\.\s*", "", lower)
-    lower = re.sub(r"^[a-z]\.\s*", "", lower)
+    lower = _ROMAN_PREFIX_RE.sub("", lower)
+    lower = _LETTER_PREFIX_RE.sub("", lower)
     for col, patterns in SUPP_SECTIONS.items():
         for pattern in patterns:
             if lower.startswith(pattern):
@@ -143,7 +213,13 @@ def parse_fr_html(filepath):
         **supp_data,
     }
 
-def download_fr_docs(urls, save_dir):
+def download_fr_docs(urls, save_dir, refresh=False):
+    """Download each unique URL into save_dir.
+
+    Files already on disk are skipped, unless refresh=True, in which case
+    they are revalidated with a conditional GET and only rewritten if the
+    server reports a change. If revalidation fails, the local copy is kept.
+    """
     seen_urls = set()
     download_list = []  # (url, filepath)
     os.makedirs(save_dir, exist_ok=True)
@@ -158,19 +234,27 @@ def download_fr_docs(urls, save_dir):
 
     success = []
     failed_urls = []
+    pending = []  # (url, filepath, revalidate)
 
-    for url, filepath in tqdm(download_list, desc="Downloading HTMLs"):
+    for url, filepath in download_list:
         # Skip if already downloaded
         if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-            success.append(filepath)
-            continue
-
-        if download_html(url, filepath):
-            success.append(filepath)
+            if refresh:
+                pending.append((url, filepath, True))
+            else:
+                success.append(filepath)
         else:
-            failed_urls.append(url)
-
-        time.sleep(0.5)
+            pending.append((url, filepath, False))
+
+    if pending:
+        etags = _load_etags(save_dir)
+        results = asyncio.run(_download_all(pending, etags))
+        _save_etags(save_dir, etags)
+        for (url, filepath, _), ok in zip(pending, results):
+            if ok:
+                success.append(filepath)
+            else:
+                failed_urls.append(url)
 
     return success, failed_urls
 
@@ -190,10 +274,20 @@ def extract_fr_docs(html_files):
     
 
 def main():
+    parser = argparse.ArgumentParser(description="Download and parse FR case HTMLs.")
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Revalidate already-downloaded HTMLs with conditional requests.",
+    )
+    args = parser.parse_args()
+
     df = pd.read_csv(INPUT_CSV)
     
     # Download HTML from the urls in the CSV file.
-    success, failed_urls = download_fr_docs(df["body_html_url"].to_list(), DOWNLOAD_DIR)
+    success, failed_urls = download_fr_docs(
+        df["body_html_url"].to_list(), DOWNLOAD_DIR, refresh=args.refresh
+    )
     print(f"\nDone! {len(success)} downloaded, {len(failed_urls)} failed.")
     if failed_urls:
         print(f"\nFailed URLs:")